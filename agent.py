@@ -1,14 +1,139 @@
 import os
 import asyncio
-from typing import Dict, List, Any, Optional
+import copy
+import functools
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple, Union
+from typing_extensions import TypedDict
 import google.generativeai as genai
+from bs4 import BeautifulSoup
+import ijson
 import json
 import logging
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+
+# Chunked extraction settings: cap the fan-out per page and the number of
+# Gemini calls in flight at once
+MAX_HTML_CHUNKS = 20
+EXTRACT_CONCURRENCY = 8
+
+# Maximum number of interpreted queries kept in memory
+STRATEGY_CACHE_SIZE = 256
+
+_CHUNK_BOUNDARY_RE = re.compile(r'</(?:article|div|section)>', re.IGNORECASE)
+_LINE_BOUNDARY_RE = re.compile(r'\n')
+
+# Queries asking for a site's generic listing, answered by its default
+# strategy: once the site keyword is removed, nothing may remain but these
+# words ("get the latest posts from", "top stories", or nothing at all)
+_LISTING_WORD = (
+    r"(?:get|show|scrape|fetch|find|list|me|the|latest|top|trending|new|hot|current|today'?s?"
+    r"|news|posts|articles|headlines|stories|from|on|at|of|front|page|frontpage|homepage|home)"
+)
+_LISTING_QUERY_RE = re.compile(rf"^(?:{_LISTING_WORD}(?:\s+{_LISTING_WORD})*)?$")
+_QUERY_PUNCT_RE = re.compile(r"[^\w\s']+")
+
+# Elements dropped before condensing HTML, and the text kept per matched element
+_BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'footer', 'svg', 'iframe']
+CONDENSED_TEXT_LIMIT = 500
+
+def _json_loads(data: str) -> Any:
+    """Parse JSON with orjson when available, falling back to the stdlib"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to compact JSON with orjson when available, falling back to the stdlib"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+class StrategySchema(TypedDict):
+    """Response schema for query interpretation"""
+    url: str
+    target_elements: List[str]
+    data_fields: List[str]
+    strategy: str
+
+class ExtractedItemSchema(TypedDict):
+    """Response schema for a single extracted item"""
+    title: str
+    link: str
+    summary: str
+    date: str
+    source: str
+    category: str
+
+@functools.lru_cache(maxsize=1)
+def _get_models(api_key: str) -> Tuple[genai.GenerativeModel, genai.GenerativeModel]:
+    """
+    Configure Gemini and build the strategy and extraction models once per
+    process, so every ScrapingAgent reuses the same clients and connections.
+    Each model has its own system instruction and JSON mode constrained to
+    the expected response schema.
+    """
+    genai.configure(api_key=api_key)
+    
+    strategy_model = genai.GenerativeModel(
+        GEMINI_MODEL_NAME,
+        system_instruction=STRATEGY_SYSTEM_PROMPT,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=StrategySchema
+        )
+    )
+    extract_model = genai.GenerativeModel(
+        GEMINI_MODEL_NAME,
+        system_instruction=EXTRACT_SYSTEM_PROMPT,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=list[ExtractedItemSchema]
+        )
+    )
+    return strategy_model, extract_model
+
+# System prompts are kept byte-identical across calls so the provider can
+# reuse the cached prefix; per-call context goes in the user prompt only
+STRATEGY_SYSTEM_PROMPT = """You are an expert web scraping strategist. Given a natural language query, determine:
+1. The target website URL (if not already provided)
+2. What type of content to scrape (articles, products, etc.)
+3. The CSS selectors or element types to target
+4. Any specific data fields to extract
+
+Respond with a JSON object containing:
+{
+    "url": "target_website_url",
+    "target_elements": ["article", "div.article", "h1", "h2", "a"],
+    "data_fields": ["title", "link", "summary", "date"],
+    "strategy": "description of scraping approach"
+}"""
+
+EXTRACT_SYSTEM_PROMPT = """You are an expert at extracting structured data from web pages. 
+Given page content and a list of target elements, extract relevant information and return it as a JSON array.
+The page content is either raw HTML or one JSON record per line describing a matched element
+with its "tag", visible "text" and "href" (if any).
+
+For each item found, create an object with these fields:
+- title: The title or headline
+- link: The URL link (if available)
+- summary: A brief summary or description
+- date: Publication date (if available)
+- source: The source website
+- category: Content category (if identifiable)
+
+Return ONLY valid JSON array, no additional text."""
+
 class ScrapingAgent:
     """
     AI agent that uses Google Gemini to:
@@ -21,11 +146,13 @@ class ScrapingAgent:
         if not self.gemini_api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
-        # Configure Gemini
-        genai.configure(api_key=self.gemini_api_key)
+        # Models (and their connections) are shared by every agent in the process
+        self.strategy_model, self.extract_model = _get_models(self.gemini_api_key)
         
-        # Initialize Gemini model
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self._extract_semaphore = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+        
+        # Scraping strategies keyed by normalized query
+        self._strategy_cache: Dict[str, Dict[str, Any]] = {}
         
         # Predefined website mappings for common queries
         self.website_mappings = {
@@ -40,10 +167,41 @@ class ScrapingAgent:
             "hacker news": "https://news.ycombinator.com",
             "medium": "https://medium.com"
         }
+        
+        # Default strategies for mapped sites with a stable, well-known layout
+        self._site_defaults = {
+            "https://news.ycombinator.com": {
+                "target_elements": ["span.titleline > a"],
+                "data_fields": ["title", "link"],
+                "strategy": "Default Hacker News front page strategy"
+            },
+            "https://www.reddit.com": {
+                "target_elements": ["shreddit-post", "article"],
+                "data_fields": ["title", "link", "date"],
+                "strategy": "Default Reddit listing strategy"
+            },
+            "https://techcrunch.com": {
+                "target_elements": ["article", "h2 a", "h3 a"],
+                "data_fields": ["title", "link", "summary", "date"],
+                "strategy": "Default TechCrunch article listing strategy"
+            },
+            "https://www.bbc.com/news": {
+                "target_elements": ["[data-testid='card-headline']", "h2", "a[href*='/news/']"],
+                "data_fields": ["title", "link", "summary"],
+                "strategy": "Default BBC News headline strategy"
+            }
+        }
+        
+        # Single alternation over all keywords, longest first so overlapping
+        # keywords resolve to the most specific one
+        self._website_keyword_re = re.compile("|".join(
+            re.escape(keyword)
+            for keyword in sorted(self.website_mappings, key=len, reverse=True)
+        ))
     
     def is_ready(self) -> bool:
         """Check if the agent is properly initialized"""
-        return bool(self.gemini_api_key and self.model)
+        return bool(self.gemini_api_key and self.strategy_model and self.extract_model)
     
     async def interpret_query(self, query: str) -> Dict[str, Any]:
         """
@@ -52,25 +210,27 @@ class ScrapingAgent:
         - What elements to scrape
         - Scraping strategy
         """
+        # First, try to extract website from query
+        website = self._extract_website_from_query(query)
+        
+        # Plain listing queries against a known site use its default strategy
+        # without a Gemini call. Its selectors are known to match whole
+        # items, so they can also be extracted in the page.
+        if website in self._site_defaults and self._is_listing_query(query):
+            strategy = {"url": website, "extract_in_page": True, **copy.deepcopy(self._site_defaults[website])}
+            logger.info(f"Using default scraping strategy for: {website}")
+            return strategy
+        
+        # Repeat queries are answered from the cache without a Gemini call
+        cache_key = self._normalize_query(query)
+        cached = self._strategy_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached scraping strategy for: {query}")
+            return copy.deepcopy(cached)
+        
         try:
-            # First, try to extract website from query
-            website = self._extract_website_from_query(query.lower())
-            
-            # Create prompt for query interpretation
-            system_prompt = """You are an expert web scraping strategist. Given a natural language query, determine:
-1. The target website URL (if not already provided)
-2. What type of content to scrape (articles, products, etc.)
-3. The CSS selectors or element types to target
-4. Any specific data fields to extract
-
-Respond with a JSON object containing:
-{
-    "url": "target_website_url",
-    "target_elements": ["article", "div.article", "h1", "h2", "a"],
-    "data_fields": ["title", "link", "summary", "date"],
-    "strategy": "description of scraping approach"
-}"""
-
+            # Only the per-query context goes in the prompt; the instructions
+            # live on the model as a stable system instruction
             user_prompt = f"""
 Query: {query}
 
@@ -78,145 +238,277 @@ Current website mapping: {website if website else "None detected"}
 
 Please provide a scraping strategy for this query.
 """
-
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
             
             # Use Gemini to generate response
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                full_prompt
-            )
+            response = await self.strategy_model.generate_content_async(user_prompt)
             
-            # Parse the response
-            try:
-                # Extract JSON from response
-                response_text = response.text
-                # Find JSON in the response (handle cases where there's extra text)
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = response_text[start_idx:end_idx]
-                    strategy = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("No JSON found in response", response_text, 0)
-                
-                # If no URL was detected in the query, use the mapped website
-                if not strategy.get("url") and website:
-                    strategy["url"] = website
-                
-                # Add default target elements if not specified
-                if not strategy.get("target_elements"):
-                    strategy["target_elements"] = ["article", "div.article", "h1", "h2", "a"]
-                
-                # Add default data fields if not specified
-                if not strategy.get("data_fields"):
-                    strategy["data_fields"] = ["title", "link", "summary", "date"]
-                
-                logger.info(f"Scraping strategy: {strategy}")
-                return strategy
-                
-            except json.JSONDecodeError:
-                # Fallback strategy if JSON parsing fails
-                logger.warning("Failed to parse AI response as JSON, using fallback strategy")
-                return {
-                    "url": website or "https://www.google.com",
-                    "target_elements": ["article", "div.article", "h1", "h2", "a"],
-                    "data_fields": ["title", "link", "summary", "date"],
-                    "strategy": "Fallback strategy due to parsing error"
-                }
+            # JSON mode guarantees the response body is the strategy object
+            strategy = _json_loads(response.text)
+            
+            # If no URL was detected in the query, use the mapped website
+            if not strategy.get("url") and website:
+                strategy["url"] = website
+            
+            # Add default target elements if not specified
+            if not strategy.get("target_elements"):
+                strategy["target_elements"] = ["article", "div.article", "h1", "h2", "a"]
+            
+            # Add default data fields if not specified
+            if not strategy.get("data_fields"):
+                strategy["data_fields"] = ["title", "link", "summary", "date"]
+            
+            logger.info(f"Scraping strategy: {strategy}")
+            self._cache_strategy(cache_key, strategy)
+            return copy.deepcopy(strategy)
                 
         except Exception as e:
             logger.error(f"Error interpreting query: {e}")
             raise Exception(f"Failed to interpret query: {str(e)}")
     
+    def clear_strategy_cache(self):
+        """Drop all cached scraping strategies"""
+        self._strategy_cache.clear()
+    
+    def _cache_strategy(self, cache_key: str, strategy: Dict[str, Any]):
+        """Store a strategy, evicting the oldest entry when the cache is full"""
+        if len(self._strategy_cache) >= STRATEGY_CACHE_SIZE:
+            self._strategy_cache.pop(next(iter(self._strategy_cache)))
+        self._strategy_cache[cache_key] = copy.deepcopy(strategy)
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalize case and whitespace so trivially different queries share a cache entry"""
+        return " ".join(query.lower().split())
+    
+    async def interpret_queries_batch(self, queries: List[str]) -> List[Union[Dict[str, Any], BaseException]]:
+        """
+        Interpret several queries concurrently so their Gemini round-trips
+        overlap instead of running back to back.
+        A query that fails does not cancel the others; its exception is
+        returned in its place.
+        """
+        return await asyncio.gather(*[self.interpret_query(query) for query in queries], return_exceptions=True)
+    
     async def extract_data(self, html_content: str, target_elements: List[str], original_query: str) -> List[Dict[str, Any]]:
         """
-        Use AI to extract structured data from HTML content based on the original query
+        Use AI to extract structured data from HTML content based on the original query.
+        Collects the items produced by extract_data_stream into a list.
         """
         try:
-            # Truncate HTML content to avoid token limits (keep first 8000 chars)
-            truncated_html = html_content[:8000] + "..." if len(html_content) > 8000 else html_content
-            
-            system_prompt = """You are an expert at extracting structured data from HTML content. 
-Given HTML content and a list of target elements, extract relevant information and return it as a JSON array.
-
-For each item found, create an object with these fields:
-- title: The title or headline
-- link: The URL link (if available)
-- summary: A brief summary or description
-- date: Publication date (if available)
-- source: The source website
-- category: Content category (if identifiable)
-
-Return ONLY valid JSON array, no additional text."""
-
-            user_prompt = f"""
+            cleaned_data = [
+                item async for item in self.extract_data_stream(html_content, target_elements, original_query)
+            ]
+            logger.info(f"Extracted {len(cleaned_data)} items")
+            return cleaned_data
+                
+        except Exception as e:
+            logger.error(f"Error extracting data: {e}")
+            return []
+    
+    async def extract_data_stream(self, html_content: str, target_elements: List[str], original_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Use AI to extract structured data from HTML content, yielding each item
+        as soon as Gemini has finished emitting it.
+        Large pages are split into chunks that are sent to Gemini concurrently.
+        """
+        # Send only the text and links of the target elements when they match,
+        # otherwise fall back to the page markup without scripts and boilerplate
+        condensed, is_records = await asyncio.to_thread(self._condense_html, html_content, target_elements)
+        if is_records:
+            # Condensed records are whole lines, so chunks cut between them
+            # need no overlap; one would start the next chunk mid-record
+            chunks = self._chunk_html(condensed, overlap=0, boundary_re=_LINE_BOUNDARY_RE)
+        else:
+            chunks = self._chunk_html(condensed)
+        if len(chunks) > MAX_HTML_CHUNKS:
+            logger.warning(f"HTML split into {len(chunks)} chunks, only the first {MAX_HTML_CHUNKS} will be used")
+            chunks = chunks[:MAX_HTML_CHUNKS]
+        
+        # Each chunk streams its items into a shared queue and signals
+        # completion with a None sentinel
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce(html_chunk: str):
+            try:
+                async for item in self._extract_chunk_stream(html_chunk, target_elements, original_query):
+                    await queue.put(item)
+            finally:
+                await queue.put(None)
+        
+        tasks = [asyncio.create_task(produce(chunk)) for chunk in chunks]
+        try:
+            # Drop items repeated across chunk overlaps
+            seen = set()
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                
+                key = (item["title"], item["link"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _extract_chunk_stream(self, html_chunk: str, target_elements: List[str], original_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract structured data from a single chunk of HTML, parsing the
+        streamed JSON array incrementally
+        """
+        # Sent as separate parts so the page content is not copied into one
+        # large prompt string
+        prompt_parts = [
+            f"""
 Original Query: {original_query}
 
 Target Elements: {', '.join(target_elements)}
 
-HTML Content:
-{truncated_html}
+Page Content:
+""",
+            html_chunk,
+            """
 
 Extract relevant data and return as JSON array.
 """
-
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            
-            # Use Gemini to generate response
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                full_prompt
-            )
+        ]
+        
+        # JSON mode guarantees the response body is an array of items, so each
+        # array element can be parsed as soon as it closes
+        items = ijson.sendable_list()
+        parser = ijson.items_coro(items, "item", use_float=True)
+        
+        try:
+            # Use Gemini to generate response, bounded to stay under the API rate limit
+            async with self._extract_semaphore:
+                response = await self.extract_model.generate_content_async(prompt_parts, stream=True)
+                async for chunk in response:
+                    parser.send(chunk.text.encode("utf-8"))
+                    for item in items:
+                        if isinstance(item, dict):
+                            yield self._clean_item(item)
+                    del items[:]
             
-            # Parse the response
-            try:
-                # Extract JSON from response
-                response_text = response.text
-                # Find JSON in the response
-                start_idx = response_text.find('[')
-                end_idx = response_text.rfind(']') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = response_text[start_idx:end_idx]
-                    extracted_data = json.loads(json_str)
-                else:
-                    # Try to find object and wrap in array
-                    start_idx = response_text.find('{')
-                    end_idx = response_text.rfind('}') + 1
-                    if start_idx != -1 and end_idx != 0:
-                        json_str = response_text[start_idx:end_idx]
-                        extracted_data = [json.loads(json_str)]
-                    else:
-                        raise json.JSONDecodeError("No JSON found in response", response_text, 0)
-                
-                # Ensure it's a list
-                if not isinstance(extracted_data, list):
-                    extracted_data = [extracted_data]
-                
-                # Clean and validate the data
-                cleaned_data = []
-                for item in extracted_data:
-                    if isinstance(item, dict):
-                        cleaned_item = {
-                            "title": item.get("title", ""),
-                            "link": item.get("link", ""),
-                            "summary": item.get("summary", ""),
-                            "date": item.get("date", ""),
-                            "source": item.get("source", ""),
-                            "category": item.get("category", "")
-                        }
-                        cleaned_data.append(cleaned_item)
-                
-                logger.info(f"Extracted {len(cleaned_data)} items")
-                return cleaned_data
-                
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse extracted data as JSON")
-                return []
+            parser.close()
+            for item in items:
+                if isinstance(item, dict):
+                    yield self._clean_item(item)
                 
+        except ijson.JSONError:
+            logger.warning("Failed to parse extracted data as JSON")
         except Exception as e:
-            logger.error(f"Error extracting data: {e}")
-            return []
+            logger.error(f"Error extracting data from chunk: {e}")
+    
+    def _clean_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize an extracted item to the expected fields"""
+        return {
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "summary": item.get("summary", ""),
+            "date": item.get("date", ""),
+            "source": item.get("source", ""),
+            "category": item.get("category", "")
+        }
+    
+    def _condense_html(self, html_content: str, target_elements: List[str]) -> Tuple[str, bool]:
+        """
+        Reduce HTML to one JSON record per line for each element matching
+        target_elements, holding only its tag, visible text and link.
+        If the selectors are invalid or match nothing, the body markup with
+        scripts, styles and other boilerplate removed is returned instead.
+        
+        Returns:
+            (content, is_records), where is_records tells whether content
+            holds line records or the stripped markup
+        """
+        soup = BeautifulSoup(html_content, 'lxml')
+        for tag in soup(_BOILERPLATE_TAGS):
+            tag.decompose()
+        
+        try:
+            nodes = soup.select(", ".join(target_elements))
+        except Exception as e:
+            logger.warning(f"Could not apply target elements {target_elements}: {e}")
+            return self._stripped_markup(html_content, soup), False
+        
+        # Links matched by the selectors themselves; an ancestor record takes
+        # its href from these rather than from its first link (e.g. a vote
+        # or author link)
+        matched_links = {id(node) for node in nodes if node.name == 'a' and node.get('href')}
+        
+        records = []
+        selected = set()
+        for node in nodes:
+            # Nested matches are already covered by their selected ancestor's text
+            if any(id(parent) in selected for parent in node.parents):
+                continue
+            selected.add(id(node))
+            
+            text = node.get_text(" ", strip=True)[:CONDENSED_TEXT_LIMIT]
+            if not text:
+                continue
+            
+            if node.name == 'a':
+                link = node
+            else:
+                links = node.find_all('a', href=True)
+                link = next((a for a in links if id(a) in matched_links), links[0] if links else None)
+            records.append(_json_dumps({
+                "tag": node.name,
+                "text": text,
+                "href": link.get('href') if link else None
+            }))
+        
+        if not records:
+            return self._stripped_markup(html_content, soup), False
+        
+        condensed = "\n".join(records)
+        logger.info(f"Condensed HTML from {len(html_content)} to {len(condensed)} characters")
+        return condensed, True
+    
+    def _stripped_markup(self, html_content: str, soup: BeautifulSoup) -> str:
+        """Serialize the body of a soup whose boilerplate tags were removed"""
+        stripped = str(soup.body or soup)
+        logger.info(f"No target element records, stripped HTML from {len(html_content)} to {len(stripped)} characters")
+        return stripped
+    
+    def _chunk_html(self, html_content: str, size: int = 6000, overlap: int = 500, boundary_re: re.Pattern = _CHUNK_BOUNDARY_RE) -> List[str]:
+        """
+        Split page content into overlapping chunks of roughly `size` characters,
+        cutting at the last `boundary_re` match (a closing block tag by default)
+        where possible
+        """
+        chunks = []
+        start = 0
+        while start < len(html_content):
+            end = start + size
+            if end >= len(html_content):
+                chunks.append(html_content[start:])
+                break
+            
+            # Cut after the last boundary in the window; the search starts
+            # past the overlap so every chunk makes progress
+            boundaries = list(boundary_re.finditer(html_content, start + overlap + 1, end))
+            if boundaries:
+                end = boundaries[-1].end()
+            
+            chunks.append(html_content[start:end])
+            start = end - overlap
+        
+        return chunks
+    
+    def _is_listing_query(self, query: str) -> bool:
+        """
+        Check whether a query only asks for a site's generic listing, e.g.
+        "latest posts from reddit", as opposed to "hacker news who is hiring"
+        """
+        remainder = self._website_keyword_re.sub(" ", query.lower())
+        remainder = " ".join(_QUERY_PUNCT_RE.sub(" ", remainder).split())
+        return _LISTING_QUERY_RE.match(remainder) is not None
     
     def _extract_website_from_query(self, query: str) -> Optional[str]:
         """
@@ -224,16 +516,12 @@ Extract relevant data and return as JSON array.
         """
         query_lower = query.lower()
         
-        for keyword, url in self.website_mappings.items():
-            if keyword in query_lower:
-                return url
+        match = self._website_keyword_re.search(query_lower)
+        if match:
+            return self.website_mappings[match.group(0)]
         
         # Check for specific patterns
-        if "bitcoin" in query_lower and "cnn" in query_lower:
-            return "https://www.cnn.com"
-        elif "tech" in query_lower and "news" in query_lower:
+        if "tech" in query_lower and "news" in query_lower:
             return "https://techcrunch.com"
-        elif "reddit" in query_lower:
-            return "https://www.reddit.com"
         
-        return None 
\ No newline at end of file
+        return None
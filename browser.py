@@ -1,34 +1,177 @@
 import asyncio
-from playwright.async_api import async_playwright, Browser, Page
-from typing import Optional
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright, BrowserContext, Page
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import logging
+import re
 import time
+from urllib.parse import urlsplit
 import httpx
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of pages loading at the same time
+MAX_CONCURRENT_PAGES = 8
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# Lazy-load scrolling moves this many pixels per step, for at most this
+# many steps, so infinite-scroll pages cannot keep it going forever
+SCROLL_STEP = 1000
+MAX_SCROLL_STEPS = 50
+
+# Chromium HTTP cache location and size (256 MB), so shared assets such as
+# JS bundles are not downloaded again on repeat visits to a site
+BROWSER_CACHE_DIR = os.path.join(tempfile.gettempdir(), "scraper-cache")
+BROWSER_CACHE_SIZE = 256 * 1024 * 1024
+
+# Chromium profile reused across runs, so profile setup and DNS/session
+# caches are paid once. Only one process at a time can use a profile.
+BROWSER_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "scraper-profile")
+
+# Timeout for the connection pre-warming requests made on startup
+PREWARM_TIMEOUT = 5.0
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Hosts known to serve complete server-rendered HTML
+STATIC_HOSTS = {
+    "news.ycombinator.com",
+    "old.reddit.com",
+}
+
+# Pages with less visible text than this are assumed to be rendered client-side
+MIN_STATIC_TEXT_LENGTH = 1000
+
+# Requests aborted while loading pages: heavy resources not needed for
+# scraping, and ad/analytics hosts that keep the network busy
+BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
+BLOCKED_HOSTS = {
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "facebook.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "newrelic.com",
+    "nr-data.net",
+}
+
+_EMPTY_APP_ROOT_RE = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>', re.IGNORECASE)
+_NON_TEXT_BLOCK_RE = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Page-side extraction of one compact record per matched element, following
+# the same rules as ScrapingAgent._condense_html: navigation and footers are
+# skipped, a match nested in another match is covered by the outer one, and
+# the link is preferably one the selector matched itself
+_EXTRACT_ITEMS_JS = """
+({selector, fields}) => {
+    const items = [];
+    const seen = new Set();
+    for (const el of document.querySelectorAll(selector)) {
+        if (el.closest('nav, footer') || (el.parentElement && el.parentElement.closest(selector))) {
+            continue;
+        }
+        
+        // The element itself if it is a link, else a matched descendant
+        // link, its first descendant link, or the link wrapping it
+        let anchor = el;
+        if (!el.matches('a[href]')) {
+            const links = Array.from(el.querySelectorAll('a[href]'));
+            anchor = links.find(link => link.matches(selector)) || links[0] || el.closest('a[href]');
+        }
+        const heading = el.querySelector('h1, h2, h3, h4');
+        const titleSource = heading || (anchor && el.contains(anchor) ? anchor : el);
+        const title = titleSource.innerText.trim().split('\\n')[0].slice(0, 200);
+        const link = anchor ? anchor.href : '';
+        const key = title + '\\u0000' + link;
+        if (!title || seen.has(key)) {
+            continue;
+        }
+        seen.add(key);
+        
+        const item = {title, link};
+        if (fields.includes('summary')) {
+            const paragraph = el.querySelector('p');
+            item.summary = paragraph ? paragraph.innerText.trim().slice(0, 300) : '';
+        }
+        if (fields.includes('date')) {
+            const time = el.querySelector('time, [datetime]');
+            item.date = time ? (time.getAttribute('datetime') || time.innerText.trim()) : '';
+        }
+        items.push(item);
+    }
+    return items;
+}
+"""
+
+def _is_blocked_host(hostname: Optional[str]) -> bool:
+    """Check whether hostname or any of its parent domains is in BLOCKED_HOSTS"""
+    if not hostname:
+        return False
+    parts = hostname.split('.')
+    return any('.'.join(parts[i:]) in BLOCKED_HOSTS for i in range(len(parts) - 1))
+
 class BrowserManager:
     """
     Manages Playwright browser instances for web scraping.
     Handles page loading, JavaScript rendering, and browser lifecycle.
+    Requests borrow pages from a pool kept open in a persistent browser
+    context, so several URLs can load in parallel without opening a new
+    tab each time, and repeat visits (also across runs) reuse the
+    profile's HTTP cache.
     """
     
-    def __init__(self):
+    def __init__(self, max_concurrent_pages: int = MAX_CONCURRENT_PAGES):
         self.playwright = None
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.context: Optional[BrowserContext] = None
         self.is_initialized = False
+        self._http: Optional[httpx.AsyncClient] = None
+        self._page_semaphore = asyncio.Semaphore(max_concurrent_pages)
+        # Open resource-blocking pages waiting to be reused; at most
+        # max_concurrent_pages exist, since every page is taken under the
+        # semaphore
+        self._idle_pages: List[Page] = []
+        self._prewarm_task: Optional[asyncio.Task] = None
     
-    async def initialize(self):
-        """Initialize the browser instance"""
+    async def initialize(self, prewarm_urls: Optional[List[str]] = None):
+        """
+        Initialize the browser instance
+        
+        Args:
+            prewarm_urls: URLs whose hosts are connected to in the background,
+                so the first real request skips DNS and TLS setup
+        """
         try:
             self.playwright = await async_playwright().start()
             
-            # Launch browser with more permissive settings
-            self.browser = await self.playwright.chromium.launch(
+            # Launch browser with more permissive settings in a persistent
+            # context, one for all requests; the route registered on it
+            # covers every page opened from it
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=BROWSER_PROFILE_DIR,
                 headless=True,  # Run in headless mode for server deployment
+                chromium_sandbox=False,
+                user_agent=USER_AGENT,
+                viewport=VIEWPORT,
                 args=[
                     '--no-sandbox',
                     '--disable-setuid-sandbox',
@@ -44,21 +187,24 @@ class BrowserManager:
                     '--disable-ipc-flooding-protection',
                     '--disable-web-security',  # Add this
                     '--disable-features=VizDisplayCompositor',  # Add this
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'  # Updated user agent
+                    f'--disk-cache-dir={BROWSER_CACHE_DIR}',
+                    f'--disk-cache-size={BROWSER_CACHE_SIZE}',
+                    f'--user-agent={USER_AGENT}'  # Updated user agent
                 ]
             )
+            await self.context.route("**/*", self._router)
             
-            # Create a new page
-            self.page = await self.browser.new_page()
-            
-            # Set viewport
-            await self.page.set_viewport_size({"width": 1920, "height": 1080})
-            
-            # Increase timeout significantly
-            self.page.set_default_timeout(60000)  # 60 seconds
+            # Shared pooled HTTP client for pages that don't need JavaScript
+            self._http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=64),
+                timeout=30.0,
+                follow_redirects=True,
+                headers={'User-Agent': USER_AGENT}
+            )
             
-            # Remove the resource blocking for now
-            # await self.page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2,ttf,otf}", self._block_resource)
+            if prewarm_urls:
+                self._prewarm_task = asyncio.create_task(self._prewarm(prewarm_urls))
             
             self.is_initialized = True
             logger.info("Browser initialized successfully")
@@ -70,13 +216,20 @@ class BrowserManager:
     async def cleanup(self):
         """Clean up browser resources"""
         try:
-            if self.page:
-                await self.page.close()
-                self.page = None
+            if self._prewarm_task:
+                self._prewarm_task.cancel()
+                self._prewarm_task = None
+            
+            if self._http:
+                await self._http.aclose()
+                self._http = None
             
-            if self.browser:
-                await self.browser.close()
-                self.browser = None
+            # Pooled pages are closed along with the context
+            self._idle_pages.clear()
+            
+            if self.context:
+                await self.context.close()
+                self.context = None
             
             if self.playwright:
                 await self.playwright.stop()
@@ -88,77 +241,183 @@ class BrowserManager:
         except Exception as e:
             logger.error(f"Error during browser cleanup: {e}")
     
-    async def is_ready(self) -> bool:
+    def is_ready(self) -> bool:
         """Check if browser is ready for use"""
-        return self.is_initialized and self.browser and self.page
+        return self.is_initialized and self.context is not None
+    
+    async def _prewarm(self, urls: List[str]):
+        """Open pooled connections to the hosts of urls ahead of the first request"""
+        results = await asyncio.gather(*[
+            self._http.head(url, timeout=PREWARM_TIMEOUT) for url in urls
+        ], return_exceptions=True)
+        warmed = sum(1 for result in results if not isinstance(result, Exception))
+        logger.info(f"Pre-warmed connections to {warmed}/{len(urls)} hosts")
+    
+    @asynccontextmanager
+    async def _new_page(self, block_resources: bool = True) -> AsyncIterator[Page]:
+        """
+        Borrow a page from the shared browser context. Resource-blocking
+        pages come from the page pool and are returned to it on exit;
+        pages loading every resource are opened for the request and closed.
+        The number of pages in use is bounded by the page semaphore.
+        """
+        async with self._page_semaphore:
+            page = None
+            while block_resources and self._idle_pages:
+                candidate = self._idle_pages.pop()
+                if not candidate.is_closed():
+                    page = candidate
+                    break
+            
+            if page is None:
+                page = await self.context.new_page()
+                
+                # Page routes take precedence over the context's blocking route
+                if not block_resources:
+                    await page.route("**/*", lambda route: route.continue_())
+                
+                # Increase timeout significantly
+                page.set_default_timeout(60000)  # 60 seconds
+            
+            reusable = False
+            try:
+                yield page
+                reusable = block_resources
+            finally:
+                await self._release_page(page, reusable)
     
-    async def get_page_content(self, url: str, wait_time: int = 3) -> Optional[str]:
+    async def _release_page(self, page: Page, reusable: bool):
+        """Return a page to the pool, or close it if it can't be reused"""
+        if reusable and not page.is_closed():
+            try:
+                # Stop the previous site's scripts and free its DOM while idle
+                await page.goto("about:blank")
+                self._idle_pages.append(page)
+                return
+            except Exception as e:
+                logger.warning(f"Could not reset page for reuse: {e}")
+        
+        try:
+            await page.close()
+        except Exception:
+            pass
+    
+    async def fetch(self, url: str, ready_selector: Optional[str] = None) -> Optional[str]:
         """
-        Navigate to URL, wait for page to load, and return HTML content
+        Load URL in a new page and return the rendered HTML content
         """
         if not self.is_ready():
             logger.error("Browser not ready")
             return None
         
         try:
-            logger.info(f"Navigating to: {url}")
-            
-            # Try with networkidle first, fallback to domcontentloaded
-            try:
-                response = await self.page.goto(url, wait_until="networkidle", timeout=60000)
-            except Exception as e:
-                logger.warning(f"Network idle timeout, trying with domcontentloaded: {e}")
-                response = await self.page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            
-            if not response or response.status >= 400:
-                logger.error(f"Failed to load page: {response.status if response else 'No response'}")
-                return None
-            
-            # Wait for page to fully load
-            try:
-                await self.page.wait_for_load_state("networkidle", timeout=30000)
-            except:
-                await self.page.wait_for_load_state("domcontentloaded", timeout=30000)
-            
-            # Additional wait for dynamic content
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-            
-            # Get the final HTML content
-            html_content = await self.page.content()
-            
-            logger.info(f"Successfully loaded page: {len(html_content)} characters")
-            return html_content
-            
+            async with self._new_page() as page:
+                return await self._load_page(page, url, ready_selector)
         except Exception as e:
             logger.error(f"Error loading page {url}: {e}")
             return None
     
-    async def _scroll_page(self):
+    async def get_page_content(self, url: str, ready_selector: Optional[str] = None) -> Optional[str]:
+        """
+        Return the HTML content of URL. A plain HTTP request is tried first;
+        the browser is only used when the page needs JavaScript to render.
+        When rendering, ready_selector (if given) marks the page as loaded
+        once a matching element exists.
+        """
+        html_content = await self.get_page_content_simple(url)
+        if html_content and not self._needs_js(url, html_content):
+            logger.info(f"Loaded {url} without browser: {len(html_content)} characters")
+            return html_content
+        
+        return await self.fetch(url, ready_selector)
+    
+    def _needs_js(self, url: str, html_content: str) -> bool:
+        """
+        Guess whether statically fetched HTML still needs JavaScript to render
+        its content: an empty app root element or very little visible text
+        """
+        if urlsplit(url).hostname in STATIC_HOSTS:
+            return False
+        
+        if _EMPTY_APP_ROOT_RE.search(html_content):
+            return True
+        
+        text = _TAG_RE.sub(' ', _NON_TEXT_BLOCK_RE.sub(' ', html_content))
+        return len(''.join(text.split())) < MIN_STATIC_TEXT_LENGTH
+    
+    async def _open_page(self, page: Page, url: str, ready_selector: Optional[str] = None) -> bool:
+        """
+        Navigate page to URL and wait until the content we need is present.
+        Returns False if the page failed to load.
+        """
+        logger.info(f"Navigating to: {url}")
+        
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        
+        if not response or response.status >= 400:
+            logger.error(f"Failed to load page: {response.status if response else 'No response'}")
+            return False
+        
+        # Stop waiting as soon as the elements we scrape exist, otherwise give
+        # the page a short window to finish loading
+        try:
+            if ready_selector:
+                await page.wait_for_selector(ready_selector, timeout=15000)
+            else:
+                await page.wait_for_load_state("load", timeout=10000)
+        except Exception as e:
+            logger.warning(f"Page not ready, using content loaded so far: {e}")
+        
+        return True
+    
+    async def _load_page(self, page: Page, url: str, ready_selector: Optional[str] = None) -> Optional[str]:
+        """
+        Navigate page to URL, wait until the content we need is present, and
+        return HTML content
+        """
+        if not await self._open_page(page, url, ready_selector):
+            return None
+        
+        # Get the final HTML content
+        html_content = await page.content()
+        
+        logger.info(f"Successfully loaded page: {len(html_content)} characters")
+        return html_content
+    
+    async def _scroll_page(self, page: Page):
         """Scroll the page to trigger lazy loading"""
         try:
-            # Get page height
-            page_height = await self.page.evaluate("document.body.scrollHeight")
-            
-            # Scroll in chunks
-            chunk_size = 1000
-            current_position = 0
-            
-            while current_position < page_height:
-                await self.page.evaluate(f"window.scrollTo(0, {current_position})")
-                await asyncio.sleep(0.5)  # Wait for content to load
-                current_position += chunk_size
-            
-            # Scroll back to top
-            await self.page.evaluate("window.scrollTo(0, 0)")
-            await asyncio.sleep(0.5)
+            # Scroll progressively inside the page, one step per animation
+            # frame, and resolve once the browser goes idle at the bottom.
+            # The bottom is the height when scrolling starts: content loaded
+            # on the way down does not extend it.
+            await page.evaluate("""
+                async ({stepSize, maxSteps}) => {
+                    await new Promise(resolve => {
+                        const idle = window.requestIdleCallback || (cb => setTimeout(cb, 100));
+                        const end = Math.min(document.body.scrollHeight, stepSize * maxSteps);
+                        let position = 0;
+                        const step = () => {
+                            window.scrollBy(0, stepSize);
+                            position += stepSize;
+                            if (position < end) {
+                                requestAnimationFrame(step);
+                            } else {
+                                idle(resolve);
+                            }
+                        };
+                        step();
+                    });
+                }
+            """, {"stepSize": SCROLL_STEP, "maxSteps": MAX_SCROLL_STEPS})
             
         except Exception as e:
             logger.warning(f"Error during page scrolling: {e}")
     
-    async def _block_resource(self, route):
-        """Block unnecessary resources to speed up loading"""
-        if route.request.resource_type in ["image", "stylesheet", "font"]:
+    async def _router(self, route):
+        """Block unnecessary resources and tracking requests to speed up loading"""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(urlsplit(request.url).hostname):
             await route.abort()
         else:
             await route.continue_()
@@ -175,12 +434,14 @@ class BrowserManager:
             True if successful, False otherwise
         """
         try:
-            html_content = await self.get_page_content(url)
-            if html_content:
-                await self.page.screenshot(path=output_path, full_page=True)
-                logger.info(f"Screenshot saved to: {output_path}")
-                return True
-            return False
+            # Keep images and styles so the screenshot looks like the real page
+            async with self._new_page(block_resources=False) as page:
+                html_content = await self._load_page(page, url)
+                if html_content:
+                    await page.screenshot(path=output_path, full_page=True)
+                    logger.info(f"Screenshot saved to: {output_path}")
+                    return True
+                return False
             
         except Exception as e:
             logger.error(f"Error taking screenshot: {e}")
@@ -197,18 +458,19 @@ class BrowserManager:
             Dictionary with page information or None if failed
         """
         try:
-            html_content = await self.get_page_content(url)
-            if not html_content:
-                return None
-            
-            # Extract basic page info
-            title = await self.page.title()
-            description = await self.page.evaluate("""
-                () => {
-                    const meta = document.querySelector('meta[name="description"]');
-                    return meta ? meta.getAttribute('content') : '';
-                }
-            """)
+            async with self._new_page() as page:
+                html_content = await self._load_page(page, url)
+                if not html_content:
+                    return None
+                
+                # Extract basic page info
+                title = await page.title()
+                description = await page.evaluate("""
+                    () => {
+                        const meta = document.querySelector('meta[name="description"]');
+                        return meta ? meta.getAttribute('content') : '';
+                    }
+                """)
             
             return {
                 "url": url,
@@ -221,19 +483,60 @@ class BrowserManager:
             logger.error(f"Error getting page info: {e}")
             return None 
 
+    async def extract_in_page(self, url: str, target_elements: List[str], data_fields: List[str]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """
+        Load URL and extract items matching target_elements directly in the
+        page, instead of transferring the full serialized DOM
+        
+        Args:
+            url: The URL to scrape
+            target_elements: CSS selectors of the item elements
+            data_fields: Fields to fill in; title and link are always included
+        
+        Returns:
+            (items, None) when items were found. (None, html_content) when
+            the page loaded but nothing matched, so callers can fall back to
+            other extraction without rendering the page again. (None, None)
+            if loading failed.
+        """
+        if not self.is_ready():
+            logger.error("Browser not ready")
+            return None, None
+        
+        try:
+            async with self._new_page() as page:
+                # Only the extracted items leave the page, unless there are none
+                if not await self._open_page(page, url, target_elements[0]):
+                    return None, None
+                
+                items = await page.evaluate(_EXTRACT_ITEMS_JS, {
+                    "selector": ", ".join(target_elements),
+                    "fields": data_fields
+                })
+                if not items:
+                    logger.info(f"No items found in page {url}, returning its HTML content")
+                    return None, await page.content()
+            
+            logger.info(f"Extracted {len(items)} items in page")
+            return items, None
+            
+        except Exception as e:
+            logger.error(f"Error extracting items in page {url}: {e}")
+            return None, None
+    
     async def get_page_content_simple(self, url: str) -> Optional[str]:
-        """Fallback method using httpx for simple pages"""
+        """Fetch a page with the shared httpx client, without rendering JavaScript"""
+        if not self._http:
+            logger.error("HTTP client not ready")
+            return None
+        
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }
-                response = await client.get(url, headers=headers)
-                if response.status_code == 200:
-                    return response.text
-                else:
-                    logger.error(f"HTTP request failed: {response.status_code}")
-                    return None
+            response = await self._http.get(url)
+            if response.status_code == 200:
+                return response.text
+            else:
+                logger.error(f"HTTP request failed: {response.status_code}")
+                return None
         except Exception as e:
             logger.error(f"Simple HTTP request failed: {e}")
             return None 
\ No newline at end of file
@@ -1,10 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import os
+import sys
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from agent import ScrapingAgent
 from browser import BrowserManager
@@ -17,7 +19,8 @@ load_dotenv()
 app = FastAPI(
     title="AI-Powered Web Scraper API",
     description="An intelligent web scraping API that uses AI to understand queries and extract structured data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -38,6 +41,9 @@ class ScrapeResponse(BaseModel):
     data: List[Dict[str, Any]]
     message: str = ""
 
+class BatchScrapeRequest(BaseModel):
+    queries: List[str]
+
 # Initialize components
 scraping_agent = ScrapingAgent()
 browser_manager = BrowserManager()
@@ -46,7 +52,7 @@ html_scraper = HTMLScraper()
 @app.on_event("startup")
 async def startup_event():
     """Initialize browser on startup"""
-    await browser_manager.initialize()
+    await browser_manager.initialize(prewarm_urls=list(scraping_agent.website_mappings.values()))
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -58,6 +64,44 @@ async def root():
     """Health check endpoint"""
     return {"message": "AI-Powered Web Scraper API is running"}
 
+async def load_page(strategy: Dict[str, Any]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """
+    Load the target page of a scraping strategy.
+    Site-default strategies read their items in the page, skipping the HTML
+    transfer and AI extraction. When that finds nothing, the HTML of the
+    already rendered page is returned instead.
+    
+    Returns:
+        (items, None) for items extracted in the page, (None, html_content)
+        for page content to extract with AI, or (None, None) if the page
+        could not be retrieved
+    """
+    if strategy.get("extract_in_page"):
+        items, html_content = await browser_manager.extract_in_page(
+            strategy["url"],
+            strategy["target_elements"],
+            strategy["data_fields"]
+        )
+        if items:
+            # Same fields as AI-extracted items
+            return [scraping_agent._clean_item(item) for item in items], None
+        return None, html_content
+    
+    html_content = await browser_manager.get_page_content(
+        strategy["url"],
+        ready_selector=strategy["target_elements"][0]
+    )
+    return None, html_content
+
+async def extract_items(query: str, strategy: Dict[str, Any], html_content: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Extract structured data from fetched page content with AI
+    """
+    if not html_content:
+        return []
+    
+    return await scraping_agent.extract_data(html_content, strategy["target_elements"], query)
+
 @app.post("/scrape", response_model=ScrapeResponse)
 async def scrape_website(request: ScrapeRequest):
     """
@@ -73,18 +117,16 @@ async def scrape_website(request: ScrapeRequest):
         if not scraping_strategy.get("url"):
             raise HTTPException(status_code=400, detail="Could not determine target URL from query")
         
-        # Step 2: Navigate to the website and get HTML content
-        html_content = await browser_manager.get_page_content(scraping_strategy["url"])
+        # Step 2: Navigate to the website and get HTML content, or the items
+        # themselves for site-default strategies
+        extracted_data, html_content = await load_page(scraping_strategy)
         
-        if not html_content:
-            raise HTTPException(status_code=500, detail="Failed to retrieve page content")
-        
-        # Step 3: Use AI to extract structured data from HTML
-        extracted_data = await scraping_agent.extract_data(
-            html_content, 
-            scraping_strategy["target_elements"],
-            request.query
-        )
+        if extracted_data is None:
+            if not html_content:
+                raise HTTPException(status_code=500, detail="Failed to retrieve page content")
+            
+            # Step 3: Use AI to extract structured data from HTML
+            extracted_data = await extract_items(request.query, scraping_strategy, html_content)
         
         return ScrapeResponse(
             success=True,
@@ -95,17 +137,78 @@ async def scrape_website(request: ScrapeRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
+async def run_many(queries: List[str]) -> List[ScrapeResponse]:
+    """
+    Scrape several queries in one go:
+    1. Interprets all queries concurrently
+    2. Fetches all target pages concurrently
+    3. Extracts data from all fetched pages concurrently
+    A query that fails at any step gets an unsuccessful response of its own
+    without affecting the others.
+    """
+    strategies = await scraping_agent.interpret_queries_batch(queries)
+    
+    # Load all target pages concurrently, each in its own browser page
+    targets = [strategy for strategy in strategies if isinstance(strategy, dict) and strategy.get("url")]
+    loaded = iter(await asyncio.gather(*[load_page(strategy) for strategy in targets], return_exceptions=True))
+    pages = [next(loaded) if isinstance(strategy, dict) and strategy.get("url") else (None, None) for strategy in strategies]
+    
+    # Pages whose items were extracted in the page have no HTML to extract
+    # from, so extract_items returns nothing for them
+    extracted = await asyncio.gather(*[
+        extract_items(query, strategy, page[1] if isinstance(page, tuple) else None)
+        for query, strategy, page in zip(queries, strategies, pages)
+    ], return_exceptions=True)
+    
+    responses = []
+    for strategy, page, data in zip(strategies, pages, extracted):
+        items, html_content = page if isinstance(page, tuple) else (None, None)
+        if isinstance(strategy, BaseException):
+            responses.append(ScrapeResponse(success=False, data=[], message=f"Scraping failed: {str(strategy)}"))
+        elif not strategy.get("url"):
+            responses.append(ScrapeResponse(success=False, data=[], message="Could not determine target URL from query"))
+        elif isinstance(page, BaseException):
+            responses.append(ScrapeResponse(success=False, data=[], message=f"Scraping failed: {str(page)}"))
+        elif items is None and not html_content:
+            responses.append(ScrapeResponse(success=False, data=[], message="Failed to retrieve page content"))
+        elif isinstance(data, BaseException):
+            responses.append(ScrapeResponse(success=False, data=[], message=f"Scraping failed: {str(data)}"))
+        else:
+            if items is not None:
+                data = items
+            responses.append(ScrapeResponse(
+                success=True,
+                data=data,
+                message=f"Successfully scraped {len(data)} items from {strategy['url']}"
+            ))
+    return responses
+
+@app.post("/scrape/batch", response_model=List[ScrapeResponse])
+async def scrape_batch(request: BatchScrapeRequest):
+    """Scrape several queries concurrently"""
+    try:
+        return await run_many(request.queries)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch scraping failed: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
     return {
         "status": "healthy",
         "components": {
-            "browser": await browser_manager.is_ready(),
+            "browser": browser_manager.is_ready(),
             "gemini": scraping_agent.is_ready()
         }
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop is not available on Windows
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
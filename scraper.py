@@ -1,87 +1,621 @@
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from bs4 import BeautifulSoup, FeatureNotFound, NavigableString, SoupStrainer, Tag
+import soupsieve
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union, cast
 import re
+import copy
+import hashlib
 import logging
-from urllib.parse import urljoin, urlparse
+import threading
+from operator import itemgetter
+from types import MappingProxyType
+from urllib.parse import urljoin, urlparse, urlsplit
 import json
 
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - selectolax is optional
+    LexborHTMLParser = None  # type: ignore[assignment,misc]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns used by the extractors
+_PUNCT_RE = re.compile(r'[^\w\s\.\,\!\?\-\:\;\(\)]')
+_ARTICLE_CLASS_RE = re.compile(r'article|post|story|content')
+_OG_RE = re.compile(r'^og:')
+_TWITTER_RE = re.compile(r'^twitter:')
+
+# str.translate table deleting the ASCII characters _PUNCT_RE removes
+_ASCII_PUNCT_TABLE = {code: None for code in range(128) if _PUNCT_RE.match(chr(code))}
+
+# Number of extract_all results kept, keyed by a hash of the HTML
+EXTRACT_CACHE_SIZE = 128
+
+# Most headlines returned for one page
+MAX_HEADLINES = 500
+
+# Result kinds produced by HTMLScraper.stream_extract
+STREAM_KINDS = ("links", "headlines", "metadata", "structured_data")
+
+# Size of the pieces fed to the pull parser in stream_extract
+_STREAM_FEED_SIZE = 64 * 1024
+
+# Elements whose text BeautifulSoup's get_text leaves out
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+# Selectors simple enough to match without soupsieve: tag, .class, [attr]
+# and [class*='text']
+_SIMPLE_SELECTOR_RE = re.compile(
+    r"^(?:(?P<tag>[a-z][a-z0-9]*)|\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)\]|\[class\*='(?P<substring>[^']+)'\])$"
+)
+
+# Strainers limiting parsing to the elements a targeted extractor reads
+_LINK_STRAIN = SoupStrainer('a', href=True)
+_HEADLINE_STRAIN = SoupStrainer(['h1', 'h2', 'h3', 'h4'])
+_META_STRAIN = SoupStrainer(['title', 'meta'])
+_JSONLD_STRAIN = SoupStrainer('script', attrs={'type': 'application/ld+json'})
+_MICRODATA_STRAIN = SoupStrainer(attrs={'itemtype': True})
+
+def _json_loads(data: str) -> Any:
+    """
+    Parse JSON with orjson when available, falling back to the stdlib.
+    orjson's decode error subclasses json.JSONDecodeError, so callers
+    catch the latter either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _lxml_text(element: Any) -> str:
+    """Concatenate the stripped text below an lxml element, like get_text(strip=True)"""
+    parts: List[str] = []
+    _collect_lxml_text(element, parts)
+    return ''.join(parts)
+
+def _collect_lxml_text(element: Any, parts: List[str]) -> None:
+    """Append the stripped text of element and its subtree, in document order"""
+    text = element.text.strip() if element.text else ''
+    if text:
+        parts.append(text)
+    for child in element:
+        # Comments and processing instructions have a non-string tag; their
+        # text and that of script, style and template subtrees is skipped
+        if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+            _collect_lxml_text(child, parts)
+        # A child's tail follows its whole subtree
+        tail = child.tail.strip() if child.tail else ''
+        if tail:
+            parts.append(tail)
+
+def _is_stream_tracked(element: Any, kinds: Set[str]) -> bool:
+    """Whether stream_extract needs the lxml element for one of kinds"""
+    tag = element.tag
+    if tag == 'a':
+        return "links" in kinds
+    if tag in ('h1', 'h2', 'h3', 'h4'):
+        return "headlines" in kinds
+    if tag in ('title', 'meta'):
+        return "metadata" in kinds
+    if tag == 'script':
+        return "structured_data" in kinds and element.get('type') == 'application/ld+json'
+    return False
+
+def _stream_results(element: Any, resolve: Callable[[str], str]) -> Iterator[Tuple[str, Any]]:
+    """Yield the stream_extract results for one finished lxml element"""
+    tag = element.tag
+    if tag == 'a':
+        href = element.get('href', '')
+        text = _lxml_text(element)
+        if href and text:
+            yield "links", {
+                "text": text,
+                "url": resolve(href),
+                "title": element.get('title', '')
+            }
+    elif tag == 'meta':
+        name = element.get('name', '')
+        prop = element.get('property', '')
+        content = element.get('content', '')
+        if name in ('description', 'keywords'):
+            yield "metadata", {name: content}
+        if _OG_RE.search(prop):
+            yield "metadata", {"open_graph": {prop.replace('og:', ''): content}}
+        if _TWITTER_RE.search(name):
+            yield "metadata", {"twitter": {name.replace('twitter:', ''): content}}
+    elif tag == 'title':
+        yield "metadata", {"title": _lxml_text(element)}
+    elif tag == 'script':
+        try:
+            data = _json_loads(element.text or '')
+        except json.JSONDecodeError:
+            return
+        if isinstance(data, list):
+            for entry in data:
+                yield "structured_data", entry
+        else:
+            yield "structured_data", data
+    else:
+        text = _lxml_text(element)
+        if text and len(text) > 10:  # Filter out short headings
+            yield "headlines", text
+
+def _make_url_resolver(base_url: str) -> Callable[[str], str]:
+    """
+    Build a function resolving hrefs against base_url, equivalent to
+    urljoin(base_url, href). base_url is parsed once; absolute URLs and
+    root-relative paths are resolved without reparsing it, and anything
+    urljoin would normalize (dot segments, empty query or params, control
+    characters) goes through urljoin.
+    """
+    base = urlsplit(base_url)
+    origin = f"{base.scheme}://{base.netloc}" if base.scheme in ('http', 'https') and base.netloc else None
+    
+    def resolve(href: str) -> str:
+        if href.isprintable() and ';' not in href and '?#' not in href and href[-1:] not in ('?', '#'):
+            if href.startswith(('http://', 'https://')):
+                if href.partition('//')[2][:1] not in ('', '/', '?', '#'):
+                    return href
+            elif origin and href[:1] == '/' and '//' not in href and '/.' not in href:
+                return origin + href
+        return urljoin(base_url, href)
+    
+    return resolve
+
+def _text_prefix(node: Tag, limit: int) -> str:
+    """
+    Return get_text(strip=True) of node, stopping once at least limit
+    characters are collected, so long bodies that only need a prefix are
+    not joined in full.
+    """
+    parts = []
+    length = 0
+    for string in node.stripped_strings:
+        parts.append(string)
+        length += len(string)
+        if length >= limit:
+            break
+    return ''.join(parts)
+
+def _lexbor_text(node: Any) -> str:
+    """Concatenate the stripped text below a lexbor node, like get_text(strip=True)"""
+    # lexbor's own text() includes script and style contents, which
+    # get_text leaves out, so only nodes containing those are walked here
+    if node.css_first('script, style, template') is None:
+        return node.text(strip=True)
+    
+    parts = []
+    
+    def walk(parent: Any) -> None:
+        for child in parent.iter(include_text=True):
+            if child.is_text_node:
+                text = child.text_content.strip() if child.text_content else ''
+                if text:
+                    parts.append(text)
+            elif child.is_element_node and child.tag not in _NON_TEXT_TAGS:
+                walk(child)
+    
+    walk(node)
+    return ''.join(parts)
+
+def _lexbor_find(element: Any, selector: str) -> Any:
+    """Return the first descendant of a lexbor node matching selector, like find()"""
+    # Scoped css() also matches the element itself, which find() never does
+    for node in element.css(selector):
+        if node != element:
+            return node
+    return None
+
+def _compile_node_matcher(selectors: Tuple[str, ...], lexbor: bool = False) -> Callable[[Any], bool]:
+    """
+    Build a predicate testing whether a node matches any selector in a group.
+    Simple selectors (tag, .class, [attr], [class*='text']) are checked
+    directly against the node's name and attributes; a group containing any
+    other selector is matched with soupsieve, or lexbor for lexbor nodes,
+    instead.
+    """
+    tags = set()
+    classes = set()
+    class_substrings = []
+    attributes = []
+    for selector in selectors:
+        match = _SIMPLE_SELECTOR_RE.match(selector)
+        if not match:
+            joined = ", ".join(selectors)
+            if lexbor:
+                return lambda node: node.css_matches(joined)
+            return soupsieve.compile(joined).match
+        if match.group('tag'):
+            tags.add(match.group('tag'))
+        elif match.group('cls'):
+            classes.add(match.group('cls'))
+        elif match.group('attr'):
+            attributes.append(match.group('attr'))
+        else:
+            class_substrings.append(match.group('substring'))
+    
+    def matches_attrs(name: str, node_attrs: Any) -> bool:
+        if name in tags:
+            return True
+        
+        for attribute in attributes:
+            if attribute in node_attrs:
+                return True
+        
+        node_classes = node_attrs.get('class')
+        if node_classes:
+            if isinstance(node_classes, str):
+                node_classes = node_classes.split()
+            for node_class in node_classes:
+                if node_class in classes:
+                    return True
+            class_value = ' '.join(node_classes)
+            for substring in class_substrings:
+                if substring in class_value:
+                    return True
+        
+        return False
+    
+    # lexbor nodes expose the tag name as .tag and their class as one string
+    if lexbor:
+        return lambda node: matches_attrs(node.tag, node.attrs)
+    return lambda node: matches_attrs(node.name, node.attrs)
+
+# Common selectors for different types of content
+_SELECTORS = MappingProxyType({
+    "articles": (
+        "article",
+        ".article",
+        ".post",
+        ".story",
+        ".content-item",
+        "[class*='article']",
+        "[class*='post']",
+        "[class*='story']"
+    ),
+    "titles": (
+        "h1",
+        "h2",
+        "h3",
+        ".title",
+        ".headline",
+        "[class*='title']",
+        "[class*='headline']"
+    ),
+    "links": (
+        "a[href]",
+        ".link",
+        "[class*='link']"
+    ),
+    "summaries": (
+        ".summary",
+        ".excerpt",
+        ".description",
+        ".content",
+        "p",
+        "[class*='summary']",
+        "[class*='excerpt']"
+    ),
+    "dates": (
+        ".date",
+        ".time",
+        ".published",
+        "[datetime]",
+        "[class*='date']",
+        "[class*='time']"
+    )
+})
+
 class HTMLScraper:
     """
     HTML parsing and data extraction using BeautifulSoup.
     Provides methods to extract structured data from HTML content.
     """
     
-    def __init__(self):
-        # Common selectors for different types of content
-        self.selectors = {
-            "articles": [
-                "article",
-                ".article",
-                ".post",
-                ".story",
-                ".content-item",
-                "[class*='article']",
-                "[class*='post']",
-                "[class*='story']"
-            ],
-            "titles": [
-                "h1",
-                "h2",
-                "h3",
-                ".title",
-                ".headline",
-                "[class*='title']",
-                "[class*='headline']"
-            ],
-            "links": [
-                "a[href]",
-                ".link",
-                "[class*='link']"
-            ],
-            "summaries": [
-                ".summary",
-                ".excerpt",
-                ".description",
-                ".content",
-                "p",
-                "[class*='summary']",
-                "[class*='excerpt']"
-            ],
-            "dates": [
-                ".date",
-                ".time",
-                ".published",
-                "[datetime]",
-                "[class*='date']",
-                "[class*='time']"
-            ]
-        }
+    # Read-only selector table shared by every instance
+    selectors = _SELECTORS
+    
+    # Each selector group joined into one CSS selector list, so a group is
+    # matched in a single traversal, and turned into a per-node predicate.
+    # Matches come back in document order, whichever selector in the group
+    # they match. Selectors never change, so these are built once for
+    # every instance.
+    _joined_selectors = MappingProxyType({
+        group: ", ".join(group_selectors) for group, group_selectors in _SELECTORS.items()
+    })
+    _node_matchers = MappingProxyType({
+        group: _compile_node_matcher(group_selectors) for group, group_selectors in _SELECTORS.items()
+    })
+    _lexbor_matchers = MappingProxyType({
+        group: _compile_node_matcher(group_selectors, lexbor=True) for group, group_selectors in _SELECTORS.items()
+    })
     
-    def parse_html(self, html_content: str) -> BeautifulSoup:
+    def __init__(self) -> None:
+        # Prefer the C-backed lxml parser, falling back to the pure-Python one
+        try:
+            BeautifulSoup('', 'lxml')
+            self._parser = 'lxml'
+        except FeatureNotFound:
+            logger.warning("lxml not available, falling back to html.parser")
+            self._parser = 'html.parser'
+        
+        # Articles are extracted with selectolax's lexbor parser when it is
+        # installed, and from the BeautifulSoup tree otherwise
+        self._backend = 'selectolax' if LexborHTMLParser is not None else 'bs4'
+        
+        # extract_all results keyed by (HTML digest, base URL); the lock keeps
+        # the cache safe for callers that share one scraper across threads
+        self._extract_cache: Dict[Tuple[bytes, str], Dict[str, Any]] = {}
+        self._extract_cache_lock = threading.Lock()
+    
+    def parse_html(self, html_content: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
         """
         Parse HTML content using BeautifulSoup
         
         Args:
             html_content: Raw HTML string
+            parse_only: Optional strainer limiting which elements are built
         
         Returns:
             BeautifulSoup object
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, self._parser, parse_only=parse_only)
             return soup
         except Exception as e:
-            logger.error(f"Error parsing HTML: {e}")
+            logger.error("Error parsing HTML: %s", e)
             raise Exception(f"HTML parsing failed: {str(e)}")
     
-    def extract_articles(self, html_content: str, base_url: str = "") -> List[Dict[str, Any]]:
+    def _ensure_soup(self, html_content: Union[str, BeautifulSoup], parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """
+        Return html_content as a BeautifulSoup object, parsing it if needed.
+        A fresh parse only builds the elements matched by parse_only.
+        """
+        if isinstance(html_content, BeautifulSoup):
+            return html_content
+        return self.parse_html(html_content, parse_only)
+    
+    def extract_all(self, html_content: str, base_url: str = "") -> Dict[str, Any]:
+        """
+        Run every extractor over a single tree of the HTML. Links, headlines,
+        metadata and JSON-LD come from stream_extract when lxml is available,
+        so only articles and microdata read the BeautifulSoup tree. Results
+        are cached by a BLAKE2b digest of the HTML, so the same page scraped
+        again is not parsed again.
+        
+        Args:
+            html_content: Raw HTML string
+            base_url: Base URL for resolving relative links
+        
+        Returns:
+            Dictionary with articles, links, headlines, metadata and structured data
+        """
+        html_hash = hashlib.blake2b(html_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cache_key = (html_hash, base_url)
+        
+        with self._extract_cache_lock:
+            cached = self._extract_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached extraction results")
+            return copy.deepcopy(cached)
+        
+        results = self._extract_all(html_content, base_url)
+        self._cache_extraction(cache_key, results)
+        return results
+    
+    def clear_extract_cache(self) -> None:
+        """Drop all cached extract_all results"""
+        with self._extract_cache_lock:
+            self._extract_cache.clear()
+    
+    def _cache_extraction(self, cache_key: Tuple[bytes, str], results: Dict[str, Any]) -> None:
+        """Store extract_all results, evicting the oldest entry when the cache is full"""
+        results = copy.deepcopy(results)
+        with self._extract_cache_lock:
+            if len(self._extract_cache) >= EXTRACT_CACHE_SIZE:
+                self._extract_cache.pop(next(iter(self._extract_cache)))
+            self._extract_cache[cache_key] = results
+    
+    def _extract_all(self, html_content: str, base_url: str) -> Dict[str, Any]:
+        """Parse the HTML and run every extractor over it, bypassing the cache"""
+        if etree is None:
+            soup = self.parse_html(html_content)
+            return {
+                "articles": self.extract_articles(soup, base_url),
+                "links": self.extract_links(soup, base_url),
+                "headlines": self.extract_headlines(soup),
+                "metadata": self.extract_metadata(soup),
+                "structured_data": self.extract_structured_data(soup)
+            }
+        
+        # With lexbor handling articles, the BeautifulSoup tree only has to
+        # hold the microdata items
+        if self._backend == 'selectolax':
+            articles = self._extract_articles_lexbor(html_content, base_url)
+            soup = self.parse_html(html_content, _MICRODATA_STRAIN)
+        else:
+            soup = self.parse_html(html_content)
+            articles = self.extract_articles(soup, base_url)
+        
+        results: Dict[str, Any] = {
+            "articles": articles,
+            "links": [],
+            "headlines": [],
+            "metadata": {},
+            "structured_data": []
+        }
+        
+        open_graph: Dict[str, str] = {}
+        twitter: Dict[str, str] = {}
+        seen_urls: Set[str] = set()
+        try:
+            for kind, item in self.stream_extract(html_content, base_url=base_url):
+                if kind == "headlines" and len(results["headlines"]) >= MAX_HEADLINES:
+                    continue
+                if kind == "links":
+                    # Keep the first link to each URL, like extract_links
+                    if item["url"] in seen_urls:
+                        continue
+                    seen_urls.add(item["url"])
+                if kind != "metadata":
+                    results[kind].append(item)
+                elif "open_graph" in item:
+                    open_graph.update(item["open_graph"])
+                elif "twitter" in item:
+                    twitter.update(item["twitter"])
+                else:
+                    # The first title, description and keywords win
+                    for key, value in item.items():
+                        results["metadata"].setdefault(key, value)
+        except Exception as e:
+            logger.error("Error streaming HTML: %s", e)
+        
+        if open_graph:
+            results["metadata"]["open_graph"] = open_graph
+        if twitter:
+            results["metadata"]["twitter"] = twitter
+        
+        # Microdata needs nested item scopes, so it is read from the tree
+        try:
+            results["structured_data"].extend(self._extract_microdata(soup))
+        except Exception as e:
+            logger.error("Error extracting microdata: %s", e)
+        
+        logger.info(
+            "Extracted %d articles, %d links, %d headlines, %d structured data items",
+            len(results['articles']), len(results['links']),
+            len(results['headlines']), len(results['structured_data'])
+        )
+        return results
+    
+    def stream_extract(self, html_content: str, kinds: Iterable[str] = STREAM_KINDS, base_url: str = "") -> Iterator[Tuple[str, Any]]:
+        """
+        Extract links, headlines, metadata and JSON-LD while the HTML is being
+        parsed, discarding elements as soon as they are no longer needed, so
+        memory stays proportional to the output rather than the document.
+        Requires lxml.
+        
+        Args:
+            html_content: Raw HTML string
+            kinds: Result kinds to produce, any of STREAM_KINDS
+            base_url: Base URL for resolving relative links
+        
+        Yields:
+            (kind, item) tuples, in document order within each kind:
+            - ("links", {"text", "url", "title"})
+            - ("headlines", headline string)
+            - ("metadata", {"title"|"description"|"keywords": value})
+              or ("metadata", {"open_graph"|"twitter": {name: value}})
+            - ("structured_data", parsed JSON-LD object)
+        """
+        if etree is None:
+            raise RuntimeError("stream_extract requires lxml")
+        if not html_content:
+            return
+        
+        wanted = set(kinds)
+        resolve = _make_url_resolver(base_url)
+        parser = etree.HTMLPullParser(events=('start', 'end'))
+        
+        # Elements whose text is still needed are "open"; nothing is freed
+        # while one is, and results are buffered until the outermost closes
+        # so they come out in start-tag order
+        open_count = 0
+        start_order: Dict[Any, int] = {}
+        buffered: List[Tuple[int, Tuple[str, Any]]] = []
+        sequence = 0
+        
+        offset = 0
+        closed = False
+        while not closed:
+            if offset < len(html_content):
+                parser.feed(html_content[offset:offset + _STREAM_FEED_SIZE])
+                offset += _STREAM_FEED_SIZE
+            else:
+                parser.close()
+                closed = True
+            
+            for event, element in parser.read_events():
+                if event == 'start':
+                    if _is_stream_tracked(element, wanted):
+                        start_order[element] = sequence
+                        sequence += 1
+                        open_count += 1
+                    continue
+                
+                if element in start_order:
+                    order = start_order.pop(element)
+                    for result in _stream_results(element, resolve):
+                        buffered.append((order, result))
+                    open_count -= 1
+                
+                if open_count == 0:
+                    if buffered:
+                        buffered.sort(key=itemgetter(0))
+                        for _, result in buffered:
+                            yield result
+                        buffered.clear()
+                    
+                    # Free the finished element and its already-processed siblings
+                    element.clear(keep_tail=True)
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+    
+    def extract_articles(self, html_content: Union[str, BeautifulSoup], base_url: str = "") -> List[Dict[str, Any]]:
         """
         Extract article-like content from HTML
         
+        Args:
+            html_content: Raw HTML string or pre-parsed BeautifulSoup
+            base_url: Base URL for resolving relative links
+        
+        Returns:
+            List of article dictionaries
+        """
+        if self._backend == 'selectolax' and isinstance(html_content, str):
+            return self._extract_articles_lexbor(html_content, base_url)
+        
+        try:
+            soup = self._ensure_soup(html_content)
+            resolve = _make_url_resolver(base_url)
+            articles = []
+            
+            # Find potential article containers in one pass; the combined
+            # selector returns each matching element once, in document order
+            article_elements = soup.select(self._joined_selectors["articles"])
+            
+            # If no specific article containers found, look for content areas
+            if not article_elements:
+                article_elements = soup.find_all(['div', 'section'], class_=_ARTICLE_CLASS_RE)
+            
+            for element in article_elements:
+                article_data = self._extract_article_data(element, resolve)
+                if article_data and self._is_valid_article(article_data):
+                    articles.append(article_data)
+            
+            logger.info("Extracted %d articles", len(articles))
+            return articles
+            
+        except Exception as e:
+            logger.error("Error extracting articles: %s", e)
+            return []
+    
+    def _extract_articles_lexbor(self, html_content: str, base_url: str) -> List[Dict[str, Any]]:
+        """
+        Extract article-like content with selectolax's lexbor parser. Mirrors
+        the BeautifulSoup path of extract_articles, but parses and selects
+        in C.
+        
         Args:
             html_content: Raw HTML string
             base_url: Base URL for resolving relative links
@@ -90,107 +624,132 @@ class HTMLScraper:
             List of article dictionaries
         """
         try:
-            soup = self.parse_html(html_content)
+            tree = LexborHTMLParser(html_content)
+            resolve = _make_url_resolver(base_url)
             articles = []
             
-            # Find potential article containers
+            # lexbor yields an element once per selector it matches, so
+            # repeats are dropped to keep each element once in document order
             article_elements = []
-            for selector in self.selectors["articles"]:
-                elements = soup.select(selector)
-                article_elements.extend(elements)
+            seen = set()
+            for element in tree.css(self._joined_selectors["articles"]):
+                if element.mem_id not in seen:
+                    seen.add(element.mem_id)
+                    article_elements.append(element)
             
             # If no specific article containers found, look for content areas
             if not article_elements:
-                article_elements = soup.find_all(['div', 'section'], class_=re.compile(r'article|post|story|content'))
+                article_elements = [
+                    element for element in tree.css('div, section')
+                    if _ARTICLE_CLASS_RE.search(element.attrs.get('class') or '')
+                ]
             
             for element in article_elements:
-                article_data = self._extract_article_data(element, base_url)
+                article_data = self._extract_article_data_lexbor(element, resolve)
                 if article_data and self._is_valid_article(article_data):
                     articles.append(article_data)
             
-            logger.info(f"Extracted {len(articles)} articles")
+            logger.info("Extracted %d articles", len(articles))
             return articles
             
         except Exception as e:
-            logger.error(f"Error extracting articles: {e}")
+            logger.error("Error extracting articles: %s", e)
             return []
     
-    def extract_links(self, html_content: str, base_url: str = "") -> List[Dict[str, str]]:
+    def extract_links(self, html_content: Union[str, BeautifulSoup], base_url: str = "") -> List[Dict[str, str]]:
         """
-        Extract all links from HTML content
+        Extract links from HTML content, keeping the first link to each URL
         
         Args:
-            html_content: Raw HTML string
+            html_content: Raw HTML string or pre-parsed BeautifulSoup
             base_url: Base URL for resolving relative links
         
         Returns:
             List of link dictionaries
         """
         try:
-            soup = self.parse_html(html_content)
-            links = []
+            soup = self._ensure_soup(html_content, _LINK_STRAIN)
+            resolve = _make_url_resolver(base_url)
+            links: List[Dict[str, str]] = []
+            seen_urls: Set[str] = set()
             
             for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
+                # href and title are single-valued, so always strings
+                href = cast(str, link.get('href', ''))
+                if not href:
+                    continue
                 
-                if href and text:
-                    # Resolve relative URLs
-                    full_url = urljoin(base_url, href)
-                    
+                # Resolve relative URLs; repeats of a listed URL (header and
+                # footer navigation) are dropped before reading their text
+                full_url = resolve(href)
+                if full_url in seen_urls:
+                    continue
+                
+                text = link.get_text(strip=True)
+                if text:
+                    seen_urls.add(full_url)
                     links.append({
                         "text": text,
                         "url": full_url,
-                        "title": link.get('title', '')
+                        "title": cast(str, link.get('title', ''))
                     })
             
-            logger.info(f"Extracted {len(links)} links")
+            logger.info("Extracted %d links", len(links))
             return links
             
         except Exception as e:
-            logger.error(f"Error extracting links: {e}")
+            logger.error("Error extracting links: %s", e)
             return []
     
-    def extract_headlines(self, html_content: str) -> List[str]:
+    def extract_headlines(self, html_content: Union[str, BeautifulSoup]) -> List[str]:
         """
         Extract headlines from HTML content
         
         Args:
-            html_content: Raw HTML string
+            html_content: Raw HTML string or pre-parsed BeautifulSoup
         
         Returns:
             List of headline strings
         """
         try:
-            soup = self.parse_html(html_content)
+            soup = self._ensure_soup(html_content, _HEADLINE_STRAIN)
             headlines = []
             
             # Find all heading elements
             for heading in soup.find_all(['h1', 'h2', 'h3', 'h4']):
-                text = heading.get_text(strip=True)
+                # A heading holding one plain string needs no descendant
+                # walk; comments and other string types go through get_text
+                string = heading.string
+                if type(string) is NavigableString:
+                    text = string.strip()
+                else:
+                    text = heading.get_text(strip=True)
+                
                 if text and len(text) > 10:  # Filter out short headings
                     headlines.append(text)
+                    if len(headlines) >= MAX_HEADLINES:
+                        break
             
-            logger.info(f"Extracted {len(headlines)} headlines")
+            logger.info("Extracted %d headlines", len(headlines))
             return headlines
             
         except Exception as e:
-            logger.error(f"Error extracting headlines: {e}")
+            logger.error("Error extracting headlines: %s", e)
             return []
     
-    def extract_metadata(self, html_content: str) -> Dict[str, Any]:
+    def extract_metadata(self, html_content: Union[str, BeautifulSoup]) -> Dict[str, Any]:
         """
         Extract metadata from HTML (title, description, keywords, etc.)
         
         Args:
-            html_content: Raw HTML string
+            html_content: Raw HTML string or pre-parsed BeautifulSoup
         
         Returns:
             Dictionary of metadata
         """
         try:
-            soup = self.parse_html(html_content)
-            metadata = {}
+            soup = self._ensure_soup(html_content, _META_STRAIN)
+            metadata: Dict[str, Any] = {}
             
             # Title
             title_tag = soup.find('title')
@@ -208,155 +767,250 @@ class HTMLScraper:
                 metadata['keywords'] = meta_keywords.get('content', '')
             
             # Open Graph tags
-            og_tags = {}
-            for tag in soup.find_all('meta', property=re.compile(r'^og:')):
-                property_name = tag.get('property', '').replace('og:', '')
-                og_tags[property_name] = tag.get('content', '')
+            og_tags: Dict[str, str] = {}
+            for tag in soup.find_all('meta', property=_OG_RE):
+                property_name = cast(str, tag.get('property', '')).replace('og:', '')
+                og_tags[property_name] = cast(str, tag.get('content', ''))
             
             if og_tags:
                 metadata['open_graph'] = og_tags
             
             # Twitter Card tags
-            twitter_tags = {}
-            for tag in soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')}):
-                name = tag.get('name', '').replace('twitter:', '')
-                twitter_tags[name] = tag.get('content', '')
+            twitter_tags: Dict[str, str] = {}
+            for tag in soup.find_all('meta', attrs={'name': _TWITTER_RE}):
+                name = cast(str, tag.get('name', '')).replace('twitter:', '')
+                twitter_tags[name] = cast(str, tag.get('content', ''))
             
             if twitter_tags:
                 metadata['twitter'] = twitter_tags
             
-            logger.info(f"Extracted metadata: {list(metadata.keys())}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Extracted metadata: %s", list(metadata.keys()))
             return metadata
             
         except Exception as e:
-            logger.error(f"Error extracting metadata: {e}")
+            logger.error("Error extracting metadata: %s", e)
             return {}
     
-    def _extract_article_data(self, element, base_url: str) -> Optional[Dict[str, Any]]:
+    def _extract_article_data(self, element: Tag, resolve: Callable[[str], str]) -> Optional[Dict[str, Any]]:
         """
         Extract data from a single article element
         
         Args:
             element: BeautifulSoup element
-            base_url: Base URL for resolving relative links
+            resolve: Resolver for relative links, from _make_url_resolver
         
         Returns:
             Article data dictionary or None
         """
         try:
-            article_data = {}
+            article_data: Dict[str, Any] = {}
+            
+            # Find title, summary and date in one walk over the element
+            text_fields = self._scan_article_text(element)
             
             # Extract title
-            title = self._extract_title(element)
+            title = text_fields['title']
             if title:
                 article_data['title'] = title
             
             # Extract link
-            link = self._extract_link(element, base_url)
+            link = self._extract_link(element, resolve)
             if link:
                 article_data['link'] = link
             
             # Extract summary
-            summary = self._extract_summary(element)
+            summary = text_fields['summary']
             if summary:
                 article_data['summary'] = summary
             
             # Extract date
-            date = self._extract_date(element)
+            date = text_fields['date']
             if date:
                 article_data['date'] = date
             
             # Extract image
-            image = self._extract_image(element, base_url)
+            image = self._extract_image(element, resolve)
             if image:
                 article_data['image'] = image
             
             return article_data if article_data else None
             
         except Exception as e:
-            logger.warning(f"Error extracting article data: {e}")
+            logger.warning("Error extracting article data: %s", e)
             return None
     
-    def _extract_title(self, element) -> Optional[str]:
-        """Extract title from element"""
-        # Look for heading elements first
-        for heading in element.find_all(['h1', 'h2', 'h3', 'h4']):
-            text = heading.get_text(strip=True)
-            if text and len(text) > 5:
-                return text
-        
-        # Look for title classes
-        for selector in self.selectors["titles"]:
-            title_elem = element.select_one(selector)
-            if title_elem:
-                text = title_elem.get_text(strip=True)
-                if text and len(text) > 5:
-                    return text
+    def _scan_article_text(self, element: Tag) -> Dict[str, Optional[str]]:
+        """
+        Find the title, summary and date of an article element in a single
+        walk over its descendants, instead of one traversal per field.
         
-        return None
+        Title: first heading (h1-h4) longer than 5 characters, otherwise the
+        first title-class element longer than 5 characters.
+        Summary: first summary-class element longer than 20 characters,
+        otherwise the first paragraph longer than 50 characters.
+        Date: first date element's datetime attribute or text.
+        
+        "First" is in document order. Each selector group is matched as a
+        whole, so the order of selectors within a group does not rank
+        matches: of a `.title` and an `[class*='title']` element, whichever
+        comes first wins.
+        """
+        heading_title = None
+        class_title = None
+        class_summary = None
+        paragraph_summary = None
+        date = None
+        
+        for node in element.descendants:
+            if not isinstance(node, Tag):
+                continue
+            
+            # Look for heading elements first
+            if heading_title is None and node.name in ('h1', 'h2', 'h3', 'h4'):
+                text = node.get_text(strip=True)
+                if len(text) > 5:
+                    heading_title = text
+            
+            # Look for title classes
+            if heading_title is None and class_title is None and self._node_matchers["titles"](node):
+                text = node.get_text(strip=True)
+                if len(text) > 5:
+                    class_title = text
+            
+            # Look for summary classes
+            if class_summary is None and self._node_matchers["summaries"](node):
+                text = _text_prefix(node, 300)
+                if len(text) > 20:
+                    class_summary = text[:300]  # Limit summary length
+            
+            # Look for paragraphs
+            if class_summary is None and paragraph_summary is None and node.name == 'p':
+                text = _text_prefix(node, 300)
+                if len(text) > 50:
+                    paragraph_summary = text[:300]
+            
+            # Look for date classes, preferring the datetime attribute
+            if date is None and self._node_matchers["dates"](node):
+                date = cast(Optional[str], node.get('datetime')) or node.get_text(strip=True) or None
+            
+            # Stop once every field has its highest-priority value
+            if heading_title is not None and class_summary is not None and date is not None:
+                break
+        
+        return {
+            'title': heading_title or class_title,
+            'summary': class_summary or paragraph_summary,
+            'date': date
+        }
+    
+    def _extract_article_data_lexbor(self, element: Any, resolve: Callable[[str], str]) -> Optional[Dict[str, Any]]:
+        """Extract data from a single lexbor article element, like _extract_article_data"""
+        try:
+            article_data: Dict[str, Any] = {}
+            text_fields = self._scan_article_text_lexbor(element)
+            
+            if text_fields['title']:
+                article_data['title'] = text_fields['title']
+            
+            # Link: the first descendant link, else the element itself
+            link_elem = _lexbor_find(element, 'a[href]')
+            if link_elem is not None and link_elem.attrs.get('href'):
+                article_data['link'] = resolve(link_elem.attrs.get('href'))
+            elif element.tag == 'a' and element.attrs.get('href'):
+                article_data['link'] = resolve(element.attrs.get('href'))
+            
+            if text_fields['summary']:
+                article_data['summary'] = text_fields['summary']
+            
+            if text_fields['date']:
+                article_data['date'] = text_fields['date']
+            
+            img_elem = _lexbor_find(element, 'img[src]')
+            if img_elem is not None and img_elem.attrs.get('src'):
+                article_data['image'] = resolve(img_elem.attrs.get('src'))
+            
+            return article_data if article_data else None
+            
+        except Exception as e:
+            logger.warning("Error extracting article data: %s", e)
+            return None
+    
+    def _scan_article_text_lexbor(self, element: Any) -> Dict[str, Optional[str]]:
+        """Find the title, summary and date of a lexbor article element, like _scan_article_text"""
+        heading_title = None
+        class_title = None
+        class_summary = None
+        paragraph_summary = None
+        date = None
+        matchers = self._lexbor_matchers
+        
+        # traverse() starts with the element itself, which descendants skips,
+        # and includes comments
+        nodes = element.traverse()
+        next(nodes, None)
+        for node in nodes:
+            if not node.is_element_node:
+                continue
+            tag = node.tag
+            
+            if heading_title is None and tag in ('h1', 'h2', 'h3', 'h4'):
+                text = _lexbor_text(node)
+                if len(text) > 5:
+                    heading_title = text
+            
+            if heading_title is None and class_title is None and matchers["titles"](node):
+                text = _lexbor_text(node)
+                if len(text) > 5:
+                    class_title = text
+            
+            if class_summary is None and matchers["summaries"](node):
+                text = _lexbor_text(node)
+                if len(text) > 20:
+                    class_summary = text[:300]
+            
+            if class_summary is None and paragraph_summary is None and tag == 'p':
+                text = _lexbor_text(node)
+                if len(text) > 50:
+                    paragraph_summary = text[:300]
+            
+            if date is None and matchers["dates"](node):
+                date = node.attrs.get('datetime') or _lexbor_text(node) or None
+            
+            if heading_title is not None and class_summary is not None and date is not None:
+                break
+        
+        return {
+            'title': heading_title or class_title,
+            'summary': class_summary or paragraph_summary,
+            'date': date
+        }
     
-    def _extract_link(self, element, base_url: str) -> Optional[str]:
+    def _extract_link(self, element: Tag, resolve: Callable[[str], str]) -> Optional[str]:
         """Extract link from element"""
         # Look for links within the element
         link_elem = element.find('a', href=True)
         if link_elem:
-            href = link_elem.get('href', '')
+            href = cast(str, link_elem.get('href', ''))
             if href:
-                return urljoin(base_url, href)
+                return resolve(href)
         
         # Check if the element itself is a link
         if element.name == 'a' and element.get('href'):
-            href = element.get('href', '')
+            href = cast(str, element.get('href', ''))
             if href:
-                return urljoin(base_url, href)
-        
-        return None
-    
-    def _extract_summary(self, element) -> Optional[str]:
-        """Extract summary from element"""
-        # Look for summary classes
-        for selector in self.selectors["summaries"]:
-            summary_elem = element.select_one(selector)
-            if summary_elem:
-                text = summary_elem.get_text(strip=True)
-                if text and len(text) > 20:
-                    return text[:300]  # Limit summary length
-        
-        # Look for paragraphs
-        paragraphs = element.find_all('p')
-        for p in paragraphs:
-            text = p.get_text(strip=True)
-            if text and len(text) > 50:
-                return text[:300]
-        
-        return None
-    
-    def _extract_date(self, element) -> Optional[str]:
-        """Extract date from element"""
-        # Look for date classes
-        for selector in self.selectors["dates"]:
-            date_elem = element.select_one(selector)
-            if date_elem:
-                # Check for datetime attribute first
-                datetime_attr = date_elem.get('datetime')
-                if datetime_attr:
-                    return datetime_attr
-                
-                # Otherwise use text content
-                text = date_elem.get_text(strip=True)
-                if text:
-                    return text
+                return resolve(href)
         
         return None
     
-    def _extract_image(self, element, base_url: str) -> Optional[str]:
+    def _extract_image(self, element: Tag, resolve: Callable[[str], str]) -> Optional[str]:
         """Extract image from element"""
         # Look for images
         img_elem = element.find('img', src=True)
         if img_elem:
-            src = img_elem.get('src', '')
+            src = cast(str, img_elem.get('src', ''))
             if src:
-                return urljoin(base_url, src)
+                return resolve(src)
         
         return None
     
@@ -381,32 +1035,40 @@ class HTMLScraper:
         if not text:
             return ""
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Remove extra whitespace; split() uses the same whitespace as \s
+        text = ' '.join(text.split())
         
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\-\:\;\(\)]', '', text)
+        # Remove special characters but keep basic punctuation. ASCII text,
+        # the common case, is filtered with a translate table instead of
+        # the regex engine
+        if text.isascii():
+            text = text.translate(_ASCII_PUNCT_TABLE)
+        else:
+            text = _PUNCT_RE.sub('', text)
         
         return text.strip()
     
-    def extract_structured_data(self, html_content: str) -> List[Dict[str, Any]]:
+    def extract_structured_data(self, html_content: Union[str, BeautifulSoup]) -> List[Dict[str, Any]]:
         """
         Extract structured data (JSON-LD, Microdata) from HTML
         
         Args:
-            html_content: Raw HTML string
+            html_content: Raw HTML string or pre-parsed BeautifulSoup
         
         Returns:
             List of structured data objects
         """
         try:
-            soup = self.parse_html(html_content)
+            # JSON-LD and microdata live in unrelated subtrees, so each
+            # gets its own strained parse
+            jsonld_soup = self._ensure_soup(html_content, _JSONLD_STRAIN)
+            microdata_soup = self._ensure_soup(html_content, _MICRODATA_STRAIN)
             structured_data = []
             
             # Extract JSON-LD scripts
-            for script in soup.find_all('script', type='application/ld+json'):
+            for script in jsonld_soup.find_all('script', type='application/ld+json'):
                 try:
-                    data = json.loads(script.string)
+                    data = _json_loads(str(script.string or ''))
                     if isinstance(data, list):
                         structured_data.extend(data)
                     else:
@@ -415,40 +1077,52 @@ class HTMLScraper:
                     continue
             
             # Extract Microdata
-            for item in soup.find_all(attrs={'itemtype': True}):
-                microdata = self._extract_microdata(item)
-                if microdata:
-                    structured_data.append(microdata)
+            structured_data.extend(self._extract_microdata(microdata_soup))
             
-            logger.info(f"Extracted {len(structured_data)} structured data items")
+            logger.info("Extracted %d structured data items", len(structured_data))
             return structured_data
             
         except Exception as e:
-            logger.error(f"Error extracting structured data: {e}")
+            logger.error("Error extracting structured data: %s", e)
             return []
     
-    def _extract_microdata(self, element) -> Optional[Dict[str, Any]]:
-        """Extract microdata from an element"""
-        try:
-            itemtype = element.get('itemtype', '')
-            if not itemtype:
-                return None
+    def _extract_microdata(self, root: Tag) -> List[Dict[str, Any]]:
+        """
+        Extract microdata items below root in a single walk. Every itemprop
+        is attached to all itemtype elements enclosing it.
+        """
+        items: List[Dict[str, Any]] = []
+        open_items: List[Dict[str, Any]] = []
+        
+        # Depth-first walk; a (node, True) entry marks leaving an itemtype element
+        pending = [(child, False) for child in reversed(root.contents)]
+        while pending:
+            node, leaving = pending.pop()
+            if leaving:
+                open_items.pop()
+                continue
             
-            microdata = {
-                'type': itemtype,
-                'properties': {}
-            }
+            if not isinstance(node, Tag):
+                continue
             
             # Extract properties
-            for prop_elem in element.find_all(attrs={'itemprop': True}):
-                prop_name = prop_elem.get('itemprop')
-                prop_value = prop_elem.get('content') or prop_elem.get_text(strip=True)
-                
-                if prop_name and prop_value:
-                    microdata['properties'][prop_name] = prop_value
+            prop_name = node.get('itemprop')
+            if prop_name and open_items:
+                prop_value = node.get('content') or node.get_text(strip=True)
+                if prop_value:
+                    for microdata in open_items:
+                        microdata['properties'][prop_name] = prop_value
             
-            return microdata if microdata['properties'] else None
+            itemtype = node.get('itemtype')
+            if itemtype:
+                microdata = {
+                    'type': itemtype,
+                    'properties': {}
+                }
+                items.append(microdata)
+                open_items.append(microdata)
+                pending.append((node, True))
             
-        except Exception as e:
-            logger.warning(f"Error extracting microdata: {e}")
-            return None 
\ No newline at end of file
+            pending.extend((child, False) for child in reversed(node.contents))
+        
+        return [microdata for microdata in items if microdata['properties']]
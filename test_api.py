@@ -7,79 +7,116 @@ import asyncio
 import httpx
 import json
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Shared API client, created on first use and closed once the tests finish
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared API client, creating it on first use"""
+    global _client
+    if _client is None:
+        # Pooled keep-alive connections (HTTP/2 where the server offers it)
+        # with a timeout long enough for scraping
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=10, keepalive_expiry=30.0),
+            timeout=60.0
+        )
+    return _client
+
+async def close_client():
+    """Close the shared API client if it was created"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def run_scrape_test(client: httpx.AsyncClient, base_url: str, i: int, query: str) -> list:
+    """Run one scraping query and return its report lines"""
+    lines = [f"\n   Test {i}: {query}"]
+    try:
+        payload = {"query": query}
+        response = await client.post(f"{base_url}/scrape", json=payload)
+        
+        if response.status_code == 200:
+            data = response.json()
+            lines.append(f"   Success: {data.get('message', 'No message')}")
+            lines.append(f"   Items extracted: {len(data.get('data', []))}")
+            
+            # Show first item if available
+            if data.get('data'):
+                first_item = data['data'][0]
+                lines.append(f"   Sample: {first_item.get('title', 'No title')[:50]}...")
+        else:
+            lines.append(f"   Failed: {response.status_code}")
+            lines.append(f"   Error: {response.text}")
+            
+    except Exception as e:
+        lines.append(f"   Error: {e}")
+    return lines
+
 async def test_api():
     """Test the API endpoints"""
     
     # API base URL
     base_url = "http://localhost:8000"
     
-    async with httpx.AsyncClient() as client:
-        print("Testing AI-Powered Web Scraper API")
-        print("=" * 50)
-        
-        # Test 1: Health check
-        print("\n1. Testing health check...")
-        try:
-            response = await client.get(f"{base_url}/health")
-            if response.status_code == 200:
-                health_data = response.json()
-                print(f"Health check passed: {health_data}")
-            else:
-                print(f"Health check failed: {response.status_code}")
-        except Exception as e:
-            print(f"Health check error: {e}")
-        
-        # Test 2: Root endpoint
-        print("\n2. Testing root endpoint...")
-        try:
-            response = await client.get(f"{base_url}/")
-            if response.status_code == 200:
-                print(f"Root endpoint: {response.json()}")
-            else:
-                print(f"Root endpoint failed: {response.status_code}")
-        except Exception as e:
-            print(f"Root endpoint error: {e}")
-        
-        # Test 3: Scraping endpoint
-        print("\n3. Testing scraping endpoint...")
-        
-        # Test queries
-        test_queries = [
-            "Get latest tech news from TechCrunch",
-            "Scrape Bitcoin articles from CNN",
-            "Get trending posts from Reddit"
-        ]
-        
-        for i, query in enumerate(test_queries, 1):
-            print(f"\n   Test {i}: {query}")
-            try:
-                payload = {"query": query}
-                response = await client.post(
-                    f"{base_url}/scrape",
-                    json=payload,
-                    timeout=60.0  # Longer timeout for scraping
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"   Success: {data.get('message', 'No message')}")
-                    print(f"   Items extracted: {len(data.get('data', []))}")
-                    
-                    # Show first item if available
-                    if data.get('data'):
-                        first_item = data['data'][0]
-                        print(f"   Sample: {first_item.get('title', 'No title')[:50]}...")
-                else:
-                    print(f"   Failed: {response.status_code}")
-                    print(f"   Error: {response.text}")
-                    
-            except Exception as e:
-                print(f"   Error: {e}")
+    client = get_client()
+    print("Testing AI-Powered Web Scraper API")
+    print("=" * 50)
+    
+    # Test 1: Health check
+    print("\n1. Testing health check...")
+    try:
+        response = await client.get(f"{base_url}/health")
+        if response.status_code == 200:
+            health_data = response.json()
+            print(f"Health check passed: {health_data}")
+        else:
+            print(f"Health check failed: {response.status_code}")
+    except Exception as e:
+        print(f"Health check error: {e}")
+    
+    # Test 2: Root endpoint
+    print("\n2. Testing root endpoint...")
+    try:
+        response = await client.get(f"{base_url}/")
+        if response.status_code == 200:
+            print(f"Root endpoint: {response.json()}")
+        else:
+            print(f"Root endpoint failed: {response.status_code}")
+    except Exception as e:
+        print(f"Root endpoint error: {e}")
+    
+    # Test 3: Scraping endpoint
+    print("\n3. Testing scraping endpoint...")
+    
+    # Test queries
+    test_queries = [
+        "Get latest tech news from TechCrunch",
+        "Scrape Bitcoin articles from CNN",
+        "Get trending posts from Reddit"
+    ]
+    
+    # Run the queries concurrently and report them in order
+    reports = await asyncio.gather(*[
+        run_scrape_test(client, base_url, i, query)
+        for i, query in enumerate(test_queries, 1)
+    ])
+    for lines in reports:
+        print("\n".join(lines))
+
+async def run_tests():
+    """Run the API tests, closing the shared client afterwards"""
+    try:
+        await test_api()
+    finally:
+        await close_client()
 
 def check_environment():
     """Check if environment is properly set up"""
@@ -102,6 +139,56 @@ def check_environment():
         else:
             print(f"{file} missing")
 
+# Nested inline markup, JSON-LD and metadata: the cases where the streaming
+# extract_all path and the tree-based extractors could disagree
+SCRAPER_SAMPLE_HTML = """
+<html><head>
+<title>Sample <b>page</b></title>
+<meta name="description" content="A sample page">
+<meta property="og:title" content="Sample">
+<script type="application/ld+json">{"@type": "NewsArticle", "headline": "Sample"}</script>
+</head><body>
+<h2>Breaking: <span>Fed <em>raises</em> rates</span> again today</h2>
+<article class="post">
+  <h3>Story <i>title</i> with nesting</h3>
+  <a href="/story/1">Read <b>now <i>more</i></b> here</a>
+  <p class="summary">A summary that is long enough <em>to be kept</em> by the scraper.</p>
+  <script>var ignored = "<h2>not a heading</h2>";</script>
+</article>
+<a href="/story/1">Duplicate link</a>
+<a href="https://example.org/">Example <span>site</span></a>
+</body></html>
+"""
+
+def check_scraper_consistency() -> bool:
+    """Check that extract_all returns the same data as the individual extractors"""
+    from scraper import HTMLScraper
+    
+    print("Scraper Consistency Check")
+    print("=" * 30)
+    
+    scraper = HTMLScraper()
+    base_url = "https://example.com/news/"
+    combined = scraper.extract_all(SCRAPER_SAMPLE_HTML, base_url)
+    individual = {
+        "articles": scraper.extract_articles(SCRAPER_SAMPLE_HTML, base_url),
+        "links": scraper.extract_links(SCRAPER_SAMPLE_HTML, base_url),
+        "headlines": scraper.extract_headlines(SCRAPER_SAMPLE_HTML),
+        "metadata": scraper.extract_metadata(SCRAPER_SAMPLE_HTML),
+        "structured_data": scraper.extract_structured_data(SCRAPER_SAMPLE_HTML)
+    }
+    
+    consistent = True
+    for key, expected in individual.items():
+        if combined[key] == expected:
+            print(f"{key} matches")
+        else:
+            consistent = False
+            print(f"{key} differs")
+            print(f"   extract_all: {combined[key]}")
+            print(f"   extractor:   {expected}")
+    return consistent
+
 if __name__ == "__main__":
     print("AI-Powered Web Scraper API Test Suite")
     print("=" * 60)
@@ -109,6 +196,10 @@ if __name__ == "__main__":
     # Check environment first
     check_environment()
     
+    # The scraper runs locally, so it is checked without the API
+    print()
+    check_scraper_consistency()
+    
     print("\n" + "=" * 60)
     print("Make sure the API is running before running tests!")
     print("   Run: python main.py")
@@ -118,6 +209,6 @@ if __name__ == "__main__":
     response = input("\nDo you want to run the API tests? (y/n): ").lower().strip()
     
     if response in ['y', 'yes']:
-        asyncio.run(test_api())
+        asyncio.run(run_tests())
     else:
         print("Tests skipped. Run the script again when the API is ready.") 
\ No newline at end of file